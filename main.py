@@ -2,19 +2,147 @@ from io import BytesIO
 import json
 import streamlit as st
 import pandas as pd
-from src.ingestion import clean_google_play_data, fetch_ios_data, combine_datasets
-from src.insights import generate_insights, analyze_d2c_data_with_creatives
+from src.ingestion import clean_google_play_data, CLEANER_VERSION, fetch_ios_data, combine_datasets
+from src.ingestion import get_shared_registry, dataset_key, IOSSnapshotStore, DatasetIndex, IngestionJobRunner
+from src.insights import generate_insights, analyze_d2c_data_with_creatives, analyze_d2c_batch, build_d2c_comparison
 from src.reports import generate_report
 from dotenv import load_dotenv
 
 load_dotenv()
+
+
+def _clean_android_stage(report, android_bytes, android_key):
+    report("Cleaning Google Play data...")
+    # Cleaned frames are shared read-only across sessions, keyed by upload content
+    registry = get_shared_registry()
+    registry.evict_unused()
+    return registry.get_or_publish(android_key, lambda: clean_google_play_data(BytesIO(android_bytes)))
+
+
+def _fetch_ios_stage(report, query, num_apps, country, language):
+    report(f"Fetching {num_apps} iOS apps for query '{query}'...")
+    ios_df = fetch_ios_data(query=query, num_apps=num_apps, country=country, lang=language)
+    snapshot_error = None
+    if not ios_df.empty:
+        # Persist every fetch so rating/review changes can be tracked over time
+        report("Saving iOS snapshot...")
+        try:
+            IOSSnapshotStore().save_snapshot(ios_df, query=query, country=country)
+        except Exception as e:
+            snapshot_error = str(e)
+    return ios_df, snapshot_error
+
+
+def _combine_stage(report, android_df, ios_df):
+    report("Combining datasets on normalized app name...")
+    combined_df = combine_datasets(android_df=android_df, ios_df=ios_df)
+    report("Generating insights...")
+    return combined_df, generate_insights(combine_df=combined_df)
+
+
+def _apply_finished_jobs() -> bool:
+    """
+    Apply finished ingestion stages to session state and submit combine once
+    both inputs are present. Runs on every rerun, whatever page is shown.
+    Returns True if session state changed.
+    """
+    jobs = st.session_state.ingestion_jobs
+    changed = False
+
+    for stage in ("android", "ios", "combine"):
+        job = jobs.get(stage)
+        if job is None or job.status != "done" or job.applied:
+            continue
+
+        job.applied = True
+        changed = True
+        if stage == "android":
+            android_df = job.result()
+            if android_df.empty:
+                job.notice = "The uploaded CSV could not be read or contained no apps. Please check the file and upload it again."
+                continue
+            st.session_state.android_df = android_df
+            st.session_state.combine_pending = True
+        elif stage == "ios":
+            ios_df, snapshot_error = job.result()
+            if snapshot_error:
+                job.notice = f"Could not save iOS snapshot: {snapshot_error}"
+            if ios_df.empty:
+                job.notice = "No iOS data was retrieved. Please check your query parameters or API key."
+                continue
+            # Logic to append new data to existing session state data and remove duplicates
+            if not st.session_state.ios_df.empty:
+                st.session_state.ios_df = pd.concat([st.session_state.ios_df, ios_df]).drop_duplicates(subset=['app_name'])
+            else:
+                st.session_state.ios_df = ios_df
+            st.session_state.combine_pending = True
+        elif stage == "combine":
+            st.session_state.combined_df, st.session_state.insights_data = job.result()
+
+    if st.session_state.combine_pending and not st.session_state.android_df.empty and not st.session_state.ios_df.empty:
+        st.session_state.combine_pending = False
+        jobs.submit("combine", _combine_stage, st.session_state.android_df, st.session_state.ios_df)
+        changed = True
+
+    return changed
+
+
+def _ingestion_poller():
+    """Background poll while stages run; full rerun once a result has been applied."""
+    if _apply_finished_jobs():
+        st.rerun()
+
+
+def _ingestion_status():
+    """Live status of background ingestion stages with cancel/retry buttons and previews."""
+    # Stages submitted during this run are not covered by the page-level poller yet
+    _ingestion_poller()
+    jobs = st.session_state.ingestion_jobs
+    stage_labels = {"android": "Android clean", "ios": "iOS fetch", "combine": "Combine & insights"}
+
+    for stage, label in stage_labels.items():
+        job = jobs.get(stage)
+        if job is None:
+            continue
+
+        status_col, cancel_col = st.columns([4, 1])
+        status_col.write(f"**{label}**: {job.message} ({job.elapsed:.1f}s)")
+        if job.status in ("queued", "running"):
+            if cancel_col.button("Cancel", key=f"cancel_{stage}"):
+                job.cancel()
+            continue
+        if job.status in ("cancelled", "failed"):
+            if cancel_col.button("Retry", key=f"retry_{stage}"):
+                jobs.retry(stage)
+                st.rerun()
+        if job.status == "failed":
+            st.error(f"{label} failed: {job.future.exception()}")
+        elif job.notice:
+            st.warning(job.notice)
+
+    if not st.session_state.android_df.empty:
+        st.write("Android Data Preview:")
+        st.dataframe(st.session_state.android_df.head())
+    if not st.session_state.ios_df.empty:
+        st.write(f"Total unique iOS apps in session: {len(st.session_state.ios_df)}")
+        st.dataframe(st.session_state.ios_df.head())
+    combine_job = jobs.get("combine")
+    if combine_job is not None and combine_job.applied:
+        if not st.session_state.combined_df.empty:
+            st.write("Combined Dataset Preview (Cross-Platform Apps):")
+            st.dataframe(st.session_state.combined_df[['app_name', 'Category', 'android_rating', 'ios_rating', 'android_installs']].head())
+            st.success(f"Datasets combined successfully! Found {st.session_state.combined_df.shape[0]} cross-platform apps.")
+        else:
+            st.warning("Combined dataset is empty. Check if any app names match after normalization.")
+
+
 def main():
     st.title("Market Intelligence Dashboard")
     st.write("Welcome to the Market Intelligence Dashboard. Here you can analyze market trends and data.")
 
 
     st.sidebar.header("Navigation")
-    page = st.sidebar.radio("Go to", ["Data Ingestion & Processing", "Insights", "Dataset", "Report", "Phase 5 D2C Analysis"])
+    page = st.sidebar.radio("Go to", ["Data Ingestion & Processing", "Insights", "Dataset", "Report", "Phase 5 D2C Analysis", "Phase 5 D2C Batch Comparison"])
 
     if 'android_df' not in st.session_state:
         st.session_state.android_df = pd.DataFrame()
@@ -27,17 +155,37 @@ def main():
         st.session_state.insights_data = {}
     if 'result' not in st.session_state:
         st.session_state.result = None
+    if 'batch_results' not in st.session_state:
+        st.session_state.batch_results = {}
+    if 'ingestion_jobs' not in st.session_state:
+        st.session_state.ingestion_jobs = IngestionJobRunner()
+    if 'combine_pending' not in st.session_state:
+        st.session_state.combine_pending = False
+    if 'android_upload_key' not in st.session_state:
+        st.session_state.android_upload_key = None
+
+    # Pick up finished ingestion stages on every page, not just the ingestion page
+    _apply_finished_jobs()
+    if st.session_state.ingestion_jobs.active():
+        st.fragment(run_every=1.0)(_ingestion_poller)()
 
     if page == "Data Ingestion & Processing":
         st.header("Ingest and Process Data")
+        jobs = st.session_state.ingestion_jobs
         android_file = st.file_uploader("Upload your CSV file", type=["csv"])
-        if android_file is not None:
-             
-            st.session_state.android_df = clean_google_play_data(android_file)
-            st.write("Data Preview:")
-            st.dataframe(st.session_state.android_df.head())
-            st.success("Data ingested successfully!")
-            
+        if android_file is None:
+            st.session_state.android_upload_key = None
+        else:
+            # Clean in the background; a new upload replaces any clean still in flight
+            android_bytes = android_file.getvalue()
+            android_key = dataset_key(android_bytes, version=CLEANER_VERSION)
+            # Re-uploading the same file after a cancelled or failed clean starts it again
+            new_upload = st.session_state.android_upload_key != android_key
+            st.session_state.android_upload_key = android_key
+            android_job = jobs.get("android")
+            if (android_job is None or android_job.inputs_key != android_key
+                    or (new_upload and android_job.status in ("cancelled", "failed"))):
+                jobs.submit("android", _clean_android_stage, android_bytes, android_key, inputs_key=android_key)
 
         
         st.subheader("2. iOS Data Fetch (App Store)")
@@ -50,53 +198,39 @@ def main():
             num_apps = st.number_input("Number of apps to fetch per query (Max 200)", min_value=1, max_value=200, value=50)
             language = st.text_input("Language code (e.g., 'en')", value="en")
         
-        # Add button to trigger the fetch operation
+        # The fetch runs alongside the Android clean; combine starts once both are in
         if st.button("Fetch iOS Data & Merge to Session", type="primary"):
-            if st.session_state.android_df.empty:
-                 st.warning("Please upload and clean Android data first to ensure normalization works correctly.")
-            
-            with st.spinner(f"Fetching {num_apps} iOS apps for query '{query}'..."):
-                try:
-                    ios_df = fetch_ios_data(query=query, num_apps=num_apps, country=country, lang=language)
-                    
-                    if not ios_df.empty:
-                        # Logic to append new data to existing session state data and remove duplicates
-                        if not st.session_state.ios_df.empty:
-                            st.session_state.ios_df = pd.concat([st.session_state.ios_df, ios_df]).drop_duplicates(subset=['app_name'])
-                        else:
-                            st.session_state.ios_df = ios_df
-
-                        st.write("iOS Data Preview (latest fetched):")
-                        st.dataframe(ios_df.head())
-                        st.success(f"iOS data fetched successfully! Total unique iOS apps in session: {len(st.session_state.ios_df)}")
-                    else:
-                        st.warning(f"No iOS data was retrieved for query '{query}'. Please check your query parameters or API key.")
-                except Exception as e:
-                    st.error(f"Error fetching iOS data: {str(e)}")
+            jobs.submit("ios", _fetch_ios_stage, query, num_apps, country, language)
+
+        with st.expander("iOS Top Movers (from saved snapshots)"):
+            mover_col1, mover_col2, mover_col3 = st.columns(3)
+            with mover_col1:
+                mover_category = st.text_input("Category (blank for all)", value="")
+            with mover_col2:
+                mover_days = st.number_input("Last N days", min_value=1, max_value=365, value=30)
+            with mover_col3:
+                mover_metric = st.selectbox("Metric", ["ios_review_count", "ios_rating", "ios_price"])
+            if st.button("Show Top Movers"):
+                movers_df = IOSSnapshotStore().top_movers(
+                    category=mover_category or None, days=mover_days, metric=mover_metric, country=country
+                )
+                if movers_df.empty:
+                    st.info("No changes recorded for this selection yet.")
+                else:
+                    st.dataframe(movers_df)
 
         # 3. Combine Datasets
         st.subheader("3. Combine Datasets ")
+        st.write("Datasets are combined automatically once Android and iOS data are both available.")
         
         if st.button("Combine Datasets for Cross-Platform Analysis", type="secondary"):
             if st.session_state.android_df.empty or st.session_state.ios_df.empty:
                 st.error("No data to combine. Please ingest Android data and fetch iOS data first.")
             else:
-                with st.spinner("Combining datasets on normalized app name..."):
-                    try:
-                        st.session_state.combined_df = combine_datasets(
-                            android_df=st.session_state.android_df, 
-                            ios_df=st.session_state.ios_df
-                        )
-                        if not st.session_state.combined_df.empty:
-                            st.write("Combined Dataset Preview (Cross-Platform Apps):")
-                            st.dataframe(st.session_state.combined_df[['app_name', 'Category', 'android_rating', 'ios_rating', 'android_installs']].head())
-                            st.success(f"Datasets combined successfully! Found {st.session_state.combined_df.shape[0]} cross-platform apps.")
-                        else:
-                            st.warning("Combined dataset is empty. Check if any app names match after normalization.")
-
-                        st.session_state.insights_data = generate_insights(combine_df = st.session_state.combined_df)
-                    except Exception as e:
-                        st.error(f"Error combining datasets: {str(e)}")
+                jobs.submit("combine", _combine_stage, st.session_state.android_df, st.session_state.ios_df)
+
+        # Refresh the status live only while a stage is in flight
+        st.fragment(run_every=1.0 if jobs.active() else None)(_ingestion_status)()
 
 
     elif page == "Dataset":
@@ -108,14 +242,43 @@ def main():
                 st.warning("Category information is not available in the merged dataset.")
                 st.dataframe(st.session_state.combined_df)
             else:
-                categories = st.session_state.combined_df['Category'].dropna().unique()
-                selected_category = st.selectbox("Select Category", ['All'] + list(categories))
+                # Rebuild the index only when combined_df has been replaced
+                if 'dataset_index' not in st.session_state or not st.session_state.dataset_index.matches(st.session_state.combined_df):
+                    st.session_state.dataset_index = DatasetIndex(st.session_state.combined_df)
+                index = st.session_state.dataset_index
 
-                if selected_category == 'All':
-                    st.dataframe(st.session_state.combined_df)
-                else:
-                    filtered_df = st.session_state.combined_df[st.session_state.combined_df['Category'] == selected_category]
-                    st.dataframe(filtered_df)
+                selected_categories = st.multiselect("Categories (empty for all)", index.categories)
+                name_query = st.text_input("App name contains", value="")
+
+                ranges = {}
+                with st.expander("Numeric filters"):
+                    for col in st.multiselect("Filter on columns", index.numeric_columns()):
+                        col_low, col_high = index.column_range(col)
+                        col_min, col_max = st.columns(2)
+                        low = col_min.number_input(f"{col} min", value=col_low)
+                        high = col_max.number_input(f"{col} max", value=col_high)
+                        ranges[col] = (low, high)
+
+                sort_col1, sort_col2, sort_col3 = st.columns(3)
+                with sort_col1:
+                    sort_by = st.selectbox("Sort by", ['(none)'] + list(st.session_state.combined_df.columns))
+                with sort_col2:
+                    ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+                with sort_col3:
+                    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+                positions = index.select(categories=selected_categories, ranges=ranges, name_query=name_query)
+                num_pages = max(1, -(-len(positions) // page_size))
+                page_num = st.number_input("Page", min_value=1, max_value=num_pages, value=1)
+
+                st.caption(f"{len(positions)} matching apps · page {page_num} of {num_pages}")
+                st.dataframe(index.page(
+                    positions,
+                    sort_by=None if sort_by == '(none)' else sort_by,
+                    ascending=ascending,
+                    page=page_num,
+                    page_size=page_size
+                ))
         else:
             st.write("No dataset available. Process data first on the 'Data Ingestion & Processing' page.")
             
@@ -130,6 +293,12 @@ def main():
                 st.subheader("Statistical Summary")
                 st.dataframe(insights_data["stats_table"])
 
+            comparison_df = insights_data.get("platform_comparison")
+            if isinstance(comparison_df, pd.DataFrame) and not comparison_df.empty:
+                st.subheader("Android vs iOS by Category")
+                only_significant = st.checkbox("Show only significant differences (BH q < 0.05)", value=True)
+                st.dataframe(comparison_df[comparison_df["Significant"]] if only_significant else comparison_df)
+
             # Display the AI-generated summary
             if "summary" in insights_data:
                 st.subheader("Executive Insights")
@@ -145,6 +314,7 @@ def main():
             # This is the crucial fix for the TypeError
             json_insights_data = {
              "stats_table": insights_data["stats_table"].to_dict(orient='records'),
+             "platform_comparison": insights_data.get("platform_comparison", pd.DataFrame()).to_dict(orient='records'),
              "summary": insights_data.get("summary", "No summary available.")
              }
 
@@ -290,7 +460,49 @@ def main():
                     mime="application/json"
                 )
 
-           
-        
+    elif page == "Phase 5 D2C Batch Comparison":
+        st.title("📊 D2C Batch Comparison")
+        uploaded_files = st.file_uploader("Upload D2C Excel/CSV files (one per brand or market)", type=["xlsx", "csv"], accept_multiple_files=True)
+        if uploaded_files and st.button("Analyze All Files", type="primary"):
+            # Raw bytes only; each worker parses its own file
+            datasets = {uploaded_file.name: uploaded_file.getvalue() for uploaded_file in uploaded_files}
+
+            st.session_state.batch_results = {}
+            progress = st.progress(0.0, text="Analyzing files...")
+            table_placeholder = st.empty()
+            # Refresh the comparison as each worker finishes
+            for name, result in analyze_d2c_batch(datasets):
+                st.session_state.batch_results[name] = result
+                if "error" in result:
+                    st.error(f"{name}: {result['error']}")
+                elif "creatives_error" in result:
+                    st.warning(f"{name}: creative generation failed ({result['creatives_error']}); KPIs are still included.")
+                done = len(st.session_state.batch_results)
+                progress.progress(done / len(datasets), text=f"Analyzed {done} of {len(datasets)} files (latest: {name})")
+                table_placeholder.dataframe(build_d2c_comparison(st.session_state.batch_results)[0])
+            progress.empty()
+            table_placeholder.empty()
+
+        if st.session_state.batch_results:
+            by_file, by_category = build_d2c_comparison(st.session_state.batch_results)
+            st.subheader("KPIs by File")
+            st.dataframe(by_file)
+            if not by_category.empty:
+                st.subheader("KPIs by File and Category")
+                st.dataframe(by_category)
+
+            with st.expander("AI-Generated Creatives by File"):
+                for name, result in st.session_state.batch_results.items():
+                    if result.get("creatives"):
+                        st.markdown(f"**{name}**")
+                        st.json(result["creatives"])
+
+            st.download_button(
+                label="Download Comparison CSV",
+                data=by_category.to_csv(index=False) if not by_category.empty else by_file.to_csv(index=False),
+                file_name="d2c_comparison.csv",
+                mime="text/csv"
+            )
+
 if __name__ == "__main__":
     main()
@@ -1,3 +1,7 @@
-from .android_loader import clean_google_play_data
+from .android_loader import clean_google_play_data, CLEANER_VERSION
 from .fetch_ios import fetch_ios_data
-from .combine_datasets import combine_datasets
\ No newline at end of file
+from .combine_datasets import combine_datasets
+from .shared_datasets import get_shared_registry, dataset_key
+from .ios_snapshot_store import IOSSnapshotStore
+from .dataset_index import DatasetIndex
+from .job_runner import IngestionJobRunner
@@ -1,5 +1,10 @@
 import pandas as pd
 import numpy as np
+
+# Bump whenever clean_google_play_data's output changes, so shared cleaned
+# frames published by an older version are not reused
+CLEANER_VERSION = "1"
+
 def clean_google_play_data(filepath):
     """
     Loads the Google Play Store dataset, performs cleaning, normalization,
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+class DatasetIndex:
+    """
+    Read-side index over the combined cross-platform frame.
+
+    Built once per `combined_df` (check with `matches`) and kept in session
+    state, it holds a category -> row positions map and lazily cached sort
+    orders, so filtering, sorting and pagination on reruns work on integer
+    positions and only the requested page is materialized.
+    """
+
+    def __init__(self, df: pd.DataFrame, category_col: str = 'Category'):
+        self.df = df
+        self.category_col = category_col
+        self.category_positions = {}
+        if category_col in df.columns:
+            codes, uniques = pd.factorize(df[category_col], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            # codes == -1 (missing category) sort first and fall outside every bucket
+            self.category_positions = {
+                cat: order[bounds[i]:bounds[i + 1]] for i, cat in enumerate(uniques)
+            }
+        self._sort_orders = {}
+        self._ranges = {}
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """True if this index was built for exactly this frame object."""
+        return self.df is df
+
+    @property
+    def categories(self) -> list:
+        return list(self.category_positions)
+
+    def numeric_columns(self) -> list:
+        return list(self.df.select_dtypes(include=np.number).columns)
+
+    def column_range(self, column: str) -> tuple:
+        """(min, max) of a numeric column, cached; (0.0, 0.0) if it has no values."""
+        if column not in self._ranges:
+            low, high = self.df[column].min(), self.df[column].max()
+            self._ranges[column] = (0.0, 0.0) if pd.isna(low) else (float(low), float(high))
+        return self._ranges[column]
+
+    def select(self, categories=None, ranges=None, name_query: str = None) -> np.ndarray:
+        """
+        Return sorted row positions matching every given filter.
+
+        Args:
+            categories (list, optional): Keep rows in any of these categories.
+            ranges (dict, optional): column -> (min, max), inclusive; rows with
+                missing values in a filtered column are dropped.
+            name_query (str, optional): Case-insensitive substring of app_name.
+        """
+        if categories:
+            buckets = [self.category_positions[c] for c in categories if c in self.category_positions]
+            positions = np.sort(np.concatenate(buckets)) if buckets else np.array([], dtype=np.intp)
+        else:
+            positions = np.arange(len(self.df))
+
+        for col, (low, high) in (ranges or {}).items():
+            if positions.size == 0:
+                break
+            values = self.df[col].to_numpy(dtype=float, na_value=np.nan)[positions]
+            positions = positions[(values >= low) & (values <= high)]
+
+        if name_query and 'app_name' in self.df.columns and positions.size:
+            names = self.df['app_name'].iloc[positions]
+            keep = names.astype(str).str.contains(name_query, case=False, regex=False, na=False)
+            positions = positions[keep.to_numpy()]
+
+        return positions
+
+    def sort_order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """Row positions of the full frame sorted by `column`, cached per direction."""
+        key = (column, ascending)
+        if key not in self._sort_orders:
+            ordered = self.df[column].reset_index(drop=True).sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            )
+            self._sort_orders[key] = ordered.index.to_numpy()
+        return self._sort_orders[key]
+
+    def page(self, positions: np.ndarray, sort_by: str = None, ascending: bool = True,
+             page: int = 1, page_size: int = 50) -> pd.DataFrame:
+        """
+        Slice one page out of `positions`, ordered by `sort_by` if given.
+        Sorting reuses the cached full-frame order, masked to the selection.
+        """
+        if sort_by is not None:
+            selected = np.zeros(len(self.df), dtype=bool)
+            selected[positions] = True
+            order = self.sort_order(sort_by, ascending)
+            positions = order[selected[order]]
+
+        start = (max(page, 1) - 1) * page_size
+        return self.df.iloc[positions[start:start + page_size]]
@@ -1,35 +1,178 @@
+import codecs
+import json
 import os
+import re
 import pandas as pd
 import requests
 import numpy as np
 
-def _parse_ios_response(raw_df: pd.DataFrame) -> pd.DataFrame:
-    """Internal function to parse raw iOS API response data into a structured and cleaned DataFrame."""
+# Raw API fields read by the parser, with the value used when a field is absent
+# from the whole payload. If a field appears in some items only, the items
+# without it get NaN, exactly as a DataFrame built from the raw list would.
+IOS_FIELD_DEFAULTS = {
+    'title': 'Unknown',
+    'primaryGenreName': None,
+    'genres': None,
+    'score': np.nan,
+    'reviews': 0,
+    'size': np.nan,
+    'free': True,
+    'Price': '0.00',
+    'updated': np.nan,
+    'contentRating': 'Everyone',
+    'requiredOsVersion': 'Varies with device',
+}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+_JSON_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+_NUMBER_CHARS = set('0123456789.eE+-')
+
+
+def _is_truncated(error: json.JSONDecodeError, buffer: str) -> bool:
+    """
+    True if a decode error can be explained by the buffer ending mid-item,
+    i.e. more input could make it valid. Anything else is malformed JSON.
+    """
+    if error.pos >= len(buffer) - 1:
+        return True
+    # The decoder reports these at the start of the string / escape / literal
+    if error.msg.startswith("Unterminated string"):
+        return True
+    if error.msg.startswith("Invalid \\uXXXX escape") and len(buffer) - error.pos < 6:
+        return True
+    tail = buffer[error.pos:]
+    # A number cut after its exponent marker decodes as a shorter number, so
+    # the error lands on the 'e' rather than at the end of the buffer
+    if re.fullmatch(r'[eE][+-]?', tail):
+        return True
+    return any(literal.startswith(tail) for literal in _JSON_LITERALS)
+
+
+def _iter_json_array(chunks):
+    """
+    Yield the items of a top-level JSON array from an iterable of text chunks,
+    keeping only the current unparsed tail in memory.
+
+    Raises:
+        ValueError: If the payload is not a JSON array, is malformed or is truncated.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    expect_item = True  # after '[' or ','; otherwise a ',' or ']' must come next
+    item_count = 0
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Payload is not a JSON array.")
+                started = True
+                pos += 1
+                continue
+            if not expect_item:
+                if buffer[pos] == ']':
+                    return
+                if buffer[pos] != ',':
+                    raise ValueError(f"Malformed JSON in payload: expected ',' or ']' after item {item_count}.")
+                expect_item = True
+                pos += 1
+                continue
+            if buffer[pos] == ']' and item_count == 0:
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not _is_truncated(e, buffer):
+                    raise ValueError(f"Malformed JSON in payload: {e}") from e
+                break  # item spans the next chunk
+            if not isinstance(item, (dict, list)):
+                # A number cut at a chunk boundary decodes as a shorter number;
+                # only accept a scalar once the text after it cannot extend it
+                rest = buffer[end:]
+                if len(rest) < 32 and set(rest) <= _NUMBER_CHARS:
+                    break
+            yield item
+            item_count += 1
+            expect_item = False
+            pos = end
+        buffer = buffer[pos:]
+    raise ValueError("Payload ended before the JSON array was closed.")
+
+
+def _iter_text_chunks(byte_chunks, encoding='utf-8'):
+    """Decode byte chunks incrementally so multi-byte characters can span chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in byte_chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_ios_items(items) -> pd.DataFrame:
+    """
+    Parse an iterable of raw iOS API items into the structured, cleaned
+    DataFrame in a single pass, extracting only the fields in
+    `IOS_FIELD_DEFAULTS` into per-column buffers.
+    """
     try:
-        
-        # Handle Price conversion
-        price_series = raw_df.get('Price', pd.Series(['0.00'] * len(raw_df)))
-        price_series = price_series.apply(lambda x: str(x).replace('$', '').strip() if pd.notna(x) else '0.00')
-        price_series = pd.to_numeric(price_series, errors='coerce').fillna(0.0)
+        buffers = {field: [] for field in IOS_FIELD_DEFAULTS}
+        seen = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for field, values in buffers.items():
+                if field in item:
+                    seen.add(field)
+                    values.append(item[field])
+                else:
+                    values.append(np.nan)
+
+        # Fields missing from every item fall back to their payload-level default
+        for field in IOS_FIELD_DEFAULTS.keys() - seen:
+            buffers[field] = [IOS_FIELD_DEFAULTS[field]] * len(buffers['title'])
+
+        if 'primaryGenreName' in seen:
+            category = buffers['primaryGenreName']
+        else:
+            category = [g[0] if isinstance(g, list) and g else 'Unknown' for g in buffers['genres']]
+
+        price = np.array([
+            _to_float(str(p).replace('$', '').strip()) if not pd.isna(p) else 0.0
+            for p in buffers['Price']
+        ], dtype=float)
+        reviews = np.array([_to_float(r) for r in buffers['reviews']], dtype=float)
 
-        # Create parsed DataFrame
         parsed_df = pd.DataFrame({
-            'app_name': raw_df.get('title', 'Unknown'),
-            'category': raw_df.get('primaryGenreName', raw_df.get('genres', pd.Series(['Unknown'] * len(raw_df))).apply(lambda x: x[0] if isinstance(x, list) and x else 'Unknown')),
-            'ios_rating': pd.to_numeric(raw_df.get('score', np.nan), errors='coerce'),
-            'ios_review_count': pd.to_numeric(raw_df.get('reviews', 0), errors='coerce').fillna(0).astype(int),
-            'ios_size': raw_df.get('size', np.nan),
+            'app_name': buffers['title'],
+            'category': category,
+            'ios_rating': np.array([_to_float(s) for s in buffers['score']], dtype=float),
+            'ios_review_count': np.nan_to_num(reviews, nan=0.0).astype(int),
+            'ios_size': buffers['size'],
             'ios_installs': np.nan,
-            'ios_type': raw_df.get('free', pd.Series([True] * len(raw_df))).apply(lambda x: 'Free' if x else 'Paid'),
-            'ios_price': price_series,
-            'ios_last_updated': pd.to_datetime(raw_df.get('updated'), errors='coerce').dt.strftime('%Y-%m-%d'),
-            'ios_content_rating': raw_df.get('contentRating', 'Everyone'),
-            'ios_version': raw_df.get('requiredOsVersion', 'Varies with device'),
+            'ios_type': ['Free' if f else 'Paid' for f in buffers['free']],
+            'ios_price': np.nan_to_num(price, nan=0.0),
+            'ios_last_updated': pd.to_datetime(pd.Series(buffers['updated'], dtype=object), errors='coerce').dt.strftime('%Y-%m-%d'),
+            'ios_content_rating': buffers['contentRating'],
+            'ios_version': buffers['requiredOsVersion'],
             'platform_ios': 'iOS'
         })
 
         # --- CRITICAL: Normalize app name for efficient merging ---
-        parsed_df['app_name'] = parsed_df['app_name'].astype(str).str.lower().str.split('[\-:\(]').str[0].str.strip()
+        parsed_df['app_name'] = parsed_df['app_name'].astype(str).str.lower().str.split(r'[\-:\(]').str[0].str.strip()
 
         return parsed_df.drop_duplicates(subset=['app_name'], keep='last').reset_index(drop=True)
 
@@ -38,6 +181,23 @@ def _parse_ios_response(raw_df: pd.DataFrame) -> pd.DataFrame:
         raise
 
 
+def _parse_ios_response(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Internal function to parse an already materialized raw iOS DataFrame."""
+    return _parse_ios_items(raw_df.to_dict(orient='records'))
+
+
+def parse_ios_payload(fp) -> pd.DataFrame:
+    """
+    Stream-parse a cached iOS API payload (a JSON array of apps) from a
+    text or binary file object without loading the whole array.
+    """
+    is_binary = isinstance(fp.read(0), bytes)
+    chunks = iter(lambda: fp.read(STREAM_CHUNK_SIZE), b'' if is_binary else '')
+    if is_binary:
+        chunks = _iter_text_chunks(chunks)
+    return _parse_ios_items(_iter_json_array(chunks))
+
+
 def fetch_ios_data(query: str, num_apps: int = 50, lang: str = "en", country: str = "us") -> pd.DataFrame:
     """
     Fetches a broad sample of app data from the iOS App Store API and cleans it.
@@ -63,17 +223,18 @@ def fetch_ios_data(query: str, num_apps: int = 50, lang: str = "en", country: st
         if not os.getenv("RAPIDAPI_KEY"):
             print("Warning: RAPIDAPI_KEY is not set. Cannot fetch live iOS data.")
             return pd.DataFrame()
-            
-        response = requests.get(API_URL, headers=HEADERS, params=querystring, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, list):
-            print(f"Successfully fetched {len(data)} iOS apps.")
-            raw_df = pd.DataFrame(data)
-            return _parse_ios_response(raw_df)
-        else:
-            print("API response was not a list of apps.")
-            return pd.DataFrame()
+
+        with requests.get(API_URL, headers=HEADERS, params=querystring, timeout=20, stream=True) as response:
+            response.raise_for_status()
+            # JSON is UTF-8; response.encoding would fall back to ISO-8859-1 for text/* types
+            chunks = _iter_text_chunks(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            try:
+                ios_df = _parse_ios_items(_iter_json_array(chunks))
+            except ValueError as e:
+                print(f"API response was not a list of apps: {e}")
+                return pd.DataFrame()
+        print(f"Successfully fetched {len(ios_df)} iOS apps.")
+        return ios_df
     except requests.exceptions.RequestException as e:
         print(f"Error fetching iOS data: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+
+
+DEFAULT_DB_PATH = os.path.join("data", "ios_snapshots.db")
+
+# Fields compared between snapshots; an app only gets a history row when one changes
+TRACKED_FIELDS = [
+    'category', 'ios_rating', 'ios_review_count', 'ios_price',
+    'ios_size', 'ios_content_rating', 'ios_version', 'ios_last_updated'
+]
+
+MOVER_METRICS = {
+    'ios_rating': 'rating_delta',
+    'ios_review_count': 'review_count_delta',
+    'ios_price': 'price_delta',
+}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fetched_at TEXT NOT NULL,
+    query TEXT,
+    country TEXT NOT NULL,
+    app_count INTEGER NOT NULL,
+    changed_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS app_latest (
+    app_name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    {', '.join(TRACKED_FIELDS)},
+    first_seen_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    last_changed_at TEXT NOT NULL,
+    PRIMARY KEY (app_name, country)
+);
+
+CREATE TABLE IF NOT EXISTS app_changes (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    app_name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    {', '.join(TRACKED_FIELDS)},
+    rating_delta REAL,
+    review_count_delta INTEGER,
+    price_delta REAL,
+    PRIMARY KEY (app_name, country, snapshot_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_changes_category_time
+    ON app_changes (category, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_app_changes_country_time
+    ON app_changes (country, fetched_at);
+"""
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class IOSSnapshotStore:
+    """
+    Embedded SQLite store for historical `fetch_ios_data` results.
+
+    Every fetch is recorded in `snapshots`. `app_latest` holds one row per
+    (app_name, country) and is upserted; `app_changes` only receives a row
+    when a tracked field differs from the latest known value, along with the
+    rating / review-count / price deltas. Change detection happens in SQL
+    against the primary key, so a snapshot only touches apps that changed.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def save_snapshot(self, ios_df: pd.DataFrame, query: str = None, country: str = "us", fetched_at: str = None) -> int:
+        """
+        Store a parsed iOS frame as a timestamped snapshot and return its id.
+        Only new or changed apps are written to the history table.
+        """
+        fetched_at = fetched_at or _utc_now()
+        rows = ios_df.reindex(columns=['app_name'] + TRACKED_FIELDS).astype(object)
+        rows = rows.where(rows.notna(), None)
+        rows = rows.drop_duplicates(subset=['app_name'], keep='last')
+        records = [(country, *r) for r in rows.itertuples(index=False, name=None)]
+
+        columns = ', '.join(TRACKED_FIELDS)
+        changed = ' OR '.join(f'l.{f} IS NOT i.{f}' for f in TRACKED_FIELDS)
+        updates = ', '.join(f'{f} = excluded.{f}' for f in TRACKED_FIELDS)
+
+        conn = self._connect()
+        try:
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO snapshots (fetched_at, query, country, app_count) VALUES (?, ?, ?, ?)",
+                    (fetched_at, query, country, len(records))
+                )
+                snapshot_id = cur.lastrowid
+
+                conn.execute(f"CREATE TEMP TABLE incoming (country TEXT, app_name TEXT, {columns})")
+                conn.executemany(
+                    f"INSERT INTO incoming VALUES ({', '.join('?' * (len(TRACKED_FIELDS) + 2))})",
+                    records
+                )
+
+                # History rows for new apps and apps whose tracked fields differ
+                cur = conn.execute(f"""
+                    INSERT INTO app_changes (
+                        snapshot_id, app_name, country, fetched_at, {columns},
+                        rating_delta, review_count_delta, price_delta
+                    )
+                    SELECT ?, i.app_name, i.country, ?, {', '.join(f'i.{f}' for f in TRACKED_FIELDS)},
+                           i.ios_rating - l.ios_rating,
+                           i.ios_review_count - l.ios_review_count,
+                           i.ios_price - l.ios_price
+                    FROM incoming i
+                    LEFT JOIN app_latest l
+                        ON l.app_name = i.app_name AND l.country = i.country
+                    WHERE l.app_name IS NULL OR {changed}
+                """, (snapshot_id, fetched_at))
+                changed_count = cur.rowcount
+
+                conn.execute(f"""
+                    INSERT INTO app_latest (
+                        app_name, country, {columns}, first_seen_at, last_seen_at, last_changed_at
+                    )
+                    SELECT app_name, country, {columns}, ?, ?, ?
+                    FROM app_changes WHERE snapshot_id = ?
+                    ON CONFLICT (app_name, country) DO UPDATE SET
+                        {updates},
+                        last_seen_at = excluded.last_seen_at,
+                        last_changed_at = excluded.last_changed_at
+                """, (fetched_at, fetched_at, fetched_at, snapshot_id))
+
+                # Unchanged apps only get their last-seen timestamp bumped
+                conn.execute("""
+                    UPDATE app_latest SET last_seen_at = ?
+                    WHERE country = ? AND last_seen_at < ?
+                      AND app_name IN (SELECT app_name FROM incoming)
+                """, (fetched_at, country, fetched_at))
+
+                conn.execute(
+                    "UPDATE snapshots SET changed_count = ? WHERE snapshot_id = ?",
+                    (changed_count, snapshot_id)
+                )
+                conn.execute("DROP TABLE incoming")
+        finally:
+            conn.close()
+
+        print(f"Saved iOS snapshot {snapshot_id}: {len(records)} apps, {changed_count} new or changed.")
+        return snapshot_id
+
+    def top_movers(self, category: str = None, days: int = 30, metric: str = 'ios_review_count',
+                   country: str = None, limit: int = 10) -> pd.DataFrame:
+        """
+        Apps with the largest net change in `metric` over the last `days` days,
+        optionally restricted to a category and/or country. Uses the
+        (category, fetched_at) index so only the requested window is read.
+        """
+        if metric not in MOVER_METRICS:
+            raise ValueError(f"Unsupported metric '{metric}'. Use one of {list(MOVER_METRICS)}.")
+        delta_col = MOVER_METRICS[metric]
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec='seconds')
+
+        # History rows are written when any tracked field changes, so skip rows
+        # where this metric itself did not move (NULL for first sightings)
+        filters = ["fetched_at >= ?", f"{delta_col} != 0"]
+        params = [since]
+        if category is not None:
+            filters.append("category = ?")
+            params.append(category)
+        if country is not None:
+            filters.append("country = ?")
+            params.append(country)
+        params.append(limit)
+
+        # Category comes from app_latest: an app's category may change inside
+        # the window, and it is not part of the grouping key
+        sql = f"""
+            SELECT m.app_name, m.country, l.category,
+                   m.net_change, m.change_count, m.last_changed_at
+            FROM (
+                SELECT app_name, country,
+                       SUM({delta_col}) AS net_change,
+                       COUNT(*) AS change_count,
+                       MAX(fetched_at) AS last_changed_at
+                FROM app_changes
+                WHERE {' AND '.join(filters)}
+                GROUP BY app_name, country
+                ORDER BY ABS(SUM({delta_col})) DESC
+                LIMIT ?
+            ) m
+            JOIN app_latest l ON l.app_name = m.app_name AND l.country = m.country
+            ORDER BY ABS(m.net_change) DESC
+        """
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def app_history(self, app_name: str, country: str = "us") -> pd.DataFrame:
+        """All recorded changes for a single app, oldest first."""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT * FROM app_changes WHERE app_name = ? AND country = ? ORDER BY fetched_at",
+                conn, params=(app_name, country)
+            )
+        finally:
+            conn.close()
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Shared by every session in the process; ingestion stages are short-lived and
+# mostly wait on the network or on pandas internals that release the GIL.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ingestion")
+
+
+class JobCancelled(Exception):
+    """Raised inside a stage when its job has been cancelled."""
+
+
+class IngestionJob:
+    """
+    Handle for one background ingestion stage.
+
+    Stages receive a `report(message)` callable as their first argument. It
+    updates the live progress message and raises `JobCancelled` once the job
+    has been cancelled, so long stages can stop at their next checkpoint.
+    Results are never written to session state from the worker thread; the
+    script thread picks them up through `future`, marks the job `applied` and
+    may attach a user-facing `notice` about the outcome.
+    """
+
+    def __init__(self, stage: str, inputs_key=None):
+        self.stage = stage
+        self.inputs_key = inputs_key
+        self.message = "Queued"
+        self.started_at = None
+        self.finished_at = None
+        self.applied = False
+        self.notice = None
+        self.future = None
+        self.call = None
+        self._cancel_event = threading.Event()
+
+    def report(self, message: str):
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.stage)
+        self.message = message
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+        self.message = "Cancelled"
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.started_at else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def result(self):
+        """Stage result, or None if the job is still running, failed or was cancelled."""
+        if self.status != "done":
+            return None
+        return self.future.result()
+
+
+class IngestionJobRunner:
+    """
+    Per-session tracker of background ingestion stages, keyed by stage name.
+    Submitting a stage that already has a job cancels the older one.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+
+    def submit(self, stage: str, fn, *args, inputs_key=None, **kwargs) -> IngestionJob:
+        previous = self.jobs.get(stage)
+        if previous is not None and previous.status in ("queued", "running"):
+            previous.cancel()
+
+        job = IngestionJob(stage, inputs_key=inputs_key)
+
+        def run():
+            job.started_at = time.time()
+            try:
+                job.report("Running")
+                result = fn(job.report, *args, **kwargs)
+                job.report("Done")
+                return result
+            finally:
+                job.finished_at = time.time()
+
+        job.future = _EXECUTOR.submit(run)
+        job.call = (fn, args, kwargs)
+        self.jobs[stage] = job
+        return job
+
+    def retry(self, stage: str):
+        """Resubmit a stage with the same function and inputs as its last job."""
+        job = self.jobs.get(stage)
+        if job is None:
+            return None
+        fn, args, kwargs = job.call
+        return self.submit(stage, fn, *args, inputs_key=job.inputs_key, **kwargs)
+
+    def get(self, stage: str):
+        return self.jobs.get(stage)
+
+    def cancel(self, stage: str):
+        job = self.jobs.get(stage)
+        if job is not None:
+            job.cancel()
+
+    def active(self) -> bool:
+        """True while any tracked stage is still queued or running."""
+        return any(job.status in ("queued", "running") for job in self.jobs.values())
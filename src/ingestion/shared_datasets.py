@@ -0,0 +1,175 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+import pandas as pd
+import pyarrow as pa
+
+
+DEFAULT_SHARED_DIR = os.path.join(tempfile.gettempdir(), "intelmarket_datasets")
+
+
+def dataset_key(data: bytes, version: str = "") -> str:
+    """
+    Content hash used to identify a cleaned upload across sessions and processes.
+
+    `version` identifies the code that produced the frame (e.g. the cleaner
+    version), so changing the cleaner stops attaching to files published by
+    the old one.
+    """
+    digest = hashlib.sha256(data)
+    digest.update(f"\0{version}".encode())
+    return digest.hexdigest()
+
+
+class SharedDatasetRegistry:
+    """
+    Process-wide registry of cleaned, read-only DataFrames.
+
+    Each dataset is published once as an Arrow IPC file on local disk and every
+    session attaches to it through a memory map, so concurrent users (and other
+    Streamlit worker processes on the same host) share the same pages instead of
+    holding private copies. Attached frames use Arrow-backed dtypes, which keeps
+    the columns pointing at the mapped buffers rather than copying them.
+
+    Reference counting is per process: each attached frame holds one reference
+    that is released when the frame is garbage collected (e.g. when a session
+    ends or replaces it). Files that no process has attached to for
+    `ttl_seconds` are removed by `evict_unused`.
+    """
+
+    def __init__(self, root: str = DEFAULT_SHARED_DIR, ttl_seconds: float = 3600):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._refcounts = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.arrow")
+
+    def publish(self, key: str, df: pd.DataFrame) -> str:
+        """
+        Write `df` as an Arrow IPC file for `key` unless another session or
+        process already did. The write goes to a private temp file and is moved
+        into place atomically, so readers never see a partial file.
+        """
+        path = self._path(key)
+        if os.path.exists(path):
+            return path
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def attach(self, key: str):
+        """
+        Return a zero-copy DataFrame view of the dataset for `key`, or None if
+        it has not been published yet.
+        """
+        path = self._path(key)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                if not os.path.exists(path):
+                    return None
+                source = pa.memory_map(path, "r")
+                table = pa.ipc.open_file(source).read_all()
+                self._tables[key] = table
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+
+        # Touch the file so other processes see it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        weakref.finalize(df, self._release, key)
+        return df
+
+    def get_or_publish(self, key: str, build) -> pd.DataFrame:
+        """
+        Attach to the dataset for `key`, building and publishing it with
+        `build()` first if no session has done so yet.
+
+        Empty results are returned as-is and never published. If the frame
+        cannot be converted to Arrow, the private copy is returned instead.
+        """
+        df = self.attach(key)
+        if df is not None:
+            return df
+
+        df = build()
+        if df.empty:
+            return df
+        try:
+            self.publish(key, df)
+        except (pa.ArrowException, OSError) as e:
+            print(f"Could not share dataset {key[:12]}: {e}")
+            return df
+        return self.attach(key)
+
+    def _release(self, key: str):
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+                return
+            self._refcounts.pop(key, None)
+            self._tables.pop(key, None)
+
+    def refcount(self, key: str) -> int:
+        with self._lock:
+            return self._refcounts.get(key, 0)
+
+    def evict_unused(self) -> list:
+        """
+        Delete dataset files with no references in this process that have not
+        been attached by any process within `ttl_seconds`. Processes that
+        still have a file mapped keep reading it safely after the unlink.
+        """
+        evicted = []
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.root):
+            if not name.endswith(".arrow"):
+                continue
+            key = name[:-len(".arrow")]
+            path = os.path.join(self.root, name)
+            with self._lock:
+                if self._refcounts.get(key, 0) > 0:
+                    continue
+                try:
+                    if os.path.getmtime(path) > cutoff:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._tables.pop(key, None)
+            evicted.append(key)
+        return evicted
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_shared_registry() -> SharedDatasetRegistry:
+    """Return the registry shared by all sessions in this process."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SharedDatasetRegistry()
+        return _registry
@@ -1,2 +1,2 @@
 from .insights import run_insights_pipeline as generate_insights
-from .phase5_insights import analyze_d2c_data_with_creatives
\ No newline at end of file
+from .phase5_insights import analyze_d2c_data_with_creatives, analyze_d2c_batch, build_d2c_comparison
\ No newline at end of file
@@ -45,7 +45,104 @@ def compute_confidence_scores(df):
 
     return pd.DataFrame(results)
 
-def interpret_with_gemini(stats_df):
+PLATFORM_PAIRS = {
+    "Rating": ("android_rating", "ios_rating"),
+    "Review Count": ("android_review_count", "ios_review_count"),
+    "Price": ("android_price", "ios_price"),
+}
+
+
+def benjamini_hochberg(p_values):
+    """
+    Benjamini–Hochberg adjusted p-values (q-values). NaN p-values are
+    ignored and stay NaN; the correction uses only the valid tests.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    q_values = np.full(p_values.shape, np.nan)
+    valid = ~np.isnan(p_values)
+    m = int(valid.sum())
+    if m == 0:
+        return q_values
+
+    p = p_values[valid]
+    order = np.argsort(p)
+    ranked = p[order] * m / np.arange(1, m + 1)
+    # Enforce monotonicity from the largest p-value down
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    adjusted = np.empty(m)
+    adjusted[order] = np.minimum(ranked, 1.0)
+    q_values[valid] = adjusted
+    return q_values
+
+
+def compute_platform_comparisons(df, group_col="Category", alpha=0.05):
+    """
+    Paired t-tests of Android vs iOS values per category, with
+    Benjamini–Hochberg correction across every (category, metric) test.
+
+    Per-category sums and squared deviations are computed with np.bincount
+    over factorized category codes, so all groups are tested in a handful
+    of array operations instead of one scipy call per group.
+    Returns: DataFrame with one row per category and metric.
+    """
+    if group_col not in df.columns:
+        return pd.DataFrame()
+
+    codes, groups = pd.factorize(df[group_col], sort=True)
+    k = len(groups)
+    frames = []
+
+    for metric, (android_col, ios_col) in PLATFORM_PAIRS.items():
+        if android_col not in df.columns or ios_col not in df.columns:
+            continue
+        android = df[android_col].to_numpy(dtype=float, na_value=np.nan)
+        ios = df[ios_col].to_numpy(dtype=float, na_value=np.nan)
+
+        # Only rows with a category and both platform values form a pair
+        valid = (codes >= 0) & ~np.isnan(android) & ~np.isnan(ios)
+        g, android, ios = codes[valid], android[valid], ios[valid]
+        diff = android - ios
+
+        n = np.bincount(g, minlength=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_android = np.bincount(g, weights=android, minlength=k) / n
+            mean_ios = np.bincount(g, weights=ios, minlength=k) / n
+            mean_diff = np.bincount(g, weights=diff, minlength=k) / n
+            # Two-pass variance: squared deviations from each group's own mean
+            var_diff = np.bincount(g, weights=(diff - mean_diff[g]) ** 2, minlength=k) / (n - 1)
+            t_stat = mean_diff / np.sqrt(var_diff / n)
+            p_val = np.where(n > 1, 2 * stats.t.sf(np.abs(t_stat), np.maximum(n - 1, 1)), np.nan)
+
+        tested = n > 0
+        frames.append(pd.DataFrame({
+            group_col: groups[tested],
+            "Metric": metric,
+            "n": n[tested],
+            "Mean Android": mean_android[tested],
+            "Mean iOS": mean_ios[tested],
+            "Mean Diff": mean_diff[tested],
+            "t-Stat": t_stat[tested],
+            "p-Value": p_val[tested],
+        }))
+
+    if not frames:
+        return pd.DataFrame()
+
+    comparison_df = pd.concat(frames, ignore_index=True)
+    comparison_df["q-Value"] = benjamini_hochberg(comparison_df["p-Value"].to_numpy())
+    comparison_df["Significant"] = comparison_df["q-Value"] < alpha
+    return comparison_df
+
+
+def summarize_platform_comparisons(comparison_df, top_n=20):
+    """Most significant platform differences (lowest q-values), for prompts and reports."""
+    if comparison_df is None or comparison_df.empty:
+        return pd.DataFrame()
+    significant = comparison_df[comparison_df["Significant"]]
+    return significant.sort_values("q-Value").head(top_n)
+
+
+def interpret_with_gemini(stats_df, comparison_df=None):
     """
     Send statistical summary to Gemini for natural language insights.
     """
@@ -53,15 +150,20 @@ def interpret_with_gemini(stats_df):
     genai.configure(api_key=GEMINI_API_KEY)
     if stats_df.empty:
         return "No numeric metrics found for statistical analysis."
+    top_differences = summarize_platform_comparisons(comparison_df)
 
     prompt = f"""
     Here is the statistical summary:
     {stats_df.to_string(index=False)}
 
+    Significant Android vs iOS differences by category (paired t-test, Benjamini–Hochberg q < 0.05):
+    {top_differences.to_string(index=False) if not top_differences.empty else "None found."}
+
     Please write a clear, concise executive summary highlighting:
     - Metrics with significant p-values (< 0.05)
     - Metrics with high or low effect sizes
     - Confidence intervals interpretation
+    - Categories where Android and iOS differ significantly
     - Key takeaways for decision-makers
 
     Provide actionable recommendations based on these insights.
@@ -73,13 +175,15 @@ def interpret_with_gemini(stats_df):
 
 def run_insights_pipeline(combine_df: pd.DataFrame) -> dict:
     """
-    Full pipeline: Compute stats → Interpret with Gemini → Return structured data
+    Full pipeline: Compute stats → Compare platforms → Interpret with Gemini → Return structured data
     """
     stats_df = compute_confidence_scores(combine_df)
-    summary = interpret_with_gemini(stats_df)
+    comparison_df = compute_platform_comparisons(combine_df)
+    summary = interpret_with_gemini(stats_df, comparison_df)
 
     insights_data = {
         "stats_table": stats_df,
+        "platform_comparison": comparison_df,
         "summary": summary
         
     }
@@ -4,9 +4,17 @@ import google.generativeai as genai
 import pandas as pd
 import numpy as np
 import os
+import multiprocessing
+from io import BytesIO
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import google.generativeai as genai
 
-def analyze_d2c_data_with_creatives(
+# Global cap on concurrent Gemini requests across all analyses in this process
+LLM_CONCURRENCY = 4
+LLM_SEMAPHORE = threading.BoundedSemaphore(LLM_CONCURRENCY)
+
+def analyze_d2c_metrics(
     data, 
     cohort_freq="M",
     category_col="category",
@@ -19,23 +27,31 @@ def analyze_d2c_data_with_creatives(
     installs_col="installs",
     signups_col="signups",
     first_purchase_col="first_purchase",
-    repeat_purchase_col="repeat_purchase"
+    repeat_purchase_col="repeat_purchase",
+    file_format=None
 ):
     """
-    Full D2C analysis: KPIs, SEO opportunities, retention, + AI-powered creative generation.
+    D2C analysis without the LLM step: KPIs, per-category KPIs, SEO
+    opportunities and retention. Pure pandas, so it can run in a worker process.
 
     Parameters:
-        data (str | pd.DataFrame): Excel path or DataFrame
+        data (str | bytes | BytesIO | pd.DataFrame): File path, raw file contents or DataFrame
+        file_format (str, optional): "csv" or "excel" for raw contents; paths
+            ending in .csv are read as CSV, everything else as Excel
     
     Returns:
-        dict: { "kpis", "seo_opportunity", "retention_summary", "creatives" }
+        dict: { "kpis", "category_kpis", "seo_opportunity", "retention_summary" }
     """
 
     # ---------------- Load Data ----------------
-    if isinstance(data, str):
-        df = pd.read_excel(data)
-    else:
+    if isinstance(data, pd.DataFrame):
         df = data.copy()
+    else:
+        if isinstance(data, bytes):
+            data = BytesIO(data)
+        if file_format is None:
+            file_format = "csv" if isinstance(data, str) and data.lower().endswith(".csv") else "excel"
+        df = pd.read_csv(data) if file_format == "csv" else pd.read_excel(data)
 
     df.columns = [c.strip().lower() for c in df.columns]
 
@@ -116,6 +132,43 @@ def analyze_d2c_data_with_creatives(
             "repeat_rate": repeat / first if first else 0
         }
 
+    # ---------------- Per-Category KPIs ----------------
+    category_kpis = pd.DataFrame()
+    if category_col in df.columns:
+        agg_cols = [c for c in [spend_col, revenue_col, impressions_col, clicks_col, first_purchase_col] if c in df.columns]
+        category_kpis = df.groupby(category_col)[agg_cols].sum().reset_index()
+        spend = category_kpis[spend_col]
+        category_kpis["ROAS"] = category_kpis[revenue_col] / spend.where(spend != 0)
+        category_kpis["CTR"] = category_kpis[clicks_col] / category_kpis[impressions_col].where(category_kpis[impressions_col] != 0)
+        if first_purchase_col in category_kpis.columns:
+            conversions = category_kpis[first_purchase_col]
+            category_kpis["CAC"] = spend / conversions.where(conversions != 0)
+        else:
+            category_kpis["CAC"] = np.nan
+
+    return {
+        "kpis": kpis,
+        "category_kpis": category_kpis,
+        "seo_opportunity": seo_opportunity,
+        "retention_summary": retention_summary,
+        "roas": roas,
+        "cac": cac,
+    }
+
+
+def generate_d2c_creatives(metrics, category_col="category"):
+    """
+    AI-powered creative generation for the top 3 SEO categories of an
+    `analyze_d2c_metrics` result. Each Gemini call holds `LLM_SEMAPHORE`,
+    so concurrent analyses share one global cap on in-flight requests.
+
+    Returns:
+        list: One dict per category with keys ad_headline, seo_meta, pdp_snippet
+    """
+    seo_opportunity = metrics["seo_opportunity"]
+    retention_summary = metrics["retention_summary"]
+    roas, cac = metrics["roas"], metrics["cac"]
+
     # ---------------- Creative Generation ----------------
     creatives = []
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") 
@@ -142,7 +195,8 @@ def analyze_d2c_data_with_creatives(
             No extra text, no markdown, no code fences.
             """
 
-            response = model.generate_content(prompt)
+            with LLM_SEMAPHORE:
+                response = model.generate_content(prompt)
             raw_text = response.text.strip()
 
             # Remove any accidental markdown fences or backticks
@@ -159,10 +213,149 @@ def analyze_d2c_data_with_creatives(
 
             creatives.append(creative_json)
 
+    return creatives
+
+
+def analyze_d2c_data_with_creatives(
+    data, 
+    cohort_freq="M",
+    category_col="category",
+    date_col="date",
+    spend_col="spend",
+    revenue_col="revenue",
+    impressions_col="impressions",
+    clicks_col="clicks",
+    conversions_col="conversions",
+    installs_col="installs",
+    signups_col="signups",
+    first_purchase_col="first_purchase",
+    repeat_purchase_col="repeat_purchase"
+):
+    """
+    Full D2C analysis: KPIs, SEO opportunities, retention, + AI-powered creative generation.
+
+    Parameters:
+        data (str | pd.DataFrame): Excel path or DataFrame
+    
+    Returns:
+        dict: { "kpis", "category_kpis", "seo_opportunity", "retention_summary", "creatives" }
+    """
+    metrics = analyze_d2c_metrics(
+        data,
+        cohort_freq=cohort_freq,
+        category_col=category_col,
+        date_col=date_col,
+        spend_col=spend_col,
+        revenue_col=revenue_col,
+        impressions_col=impressions_col,
+        clicks_col=clicks_col,
+        conversions_col=conversions_col,
+        installs_col=installs_col,
+        signups_col=signups_col,
+        first_purchase_col=first_purchase_col,
+        repeat_purchase_col=repeat_purchase_col
+    )
+    return _with_creatives(metrics, category_col)
+
+
+def _with_creatives(metrics, category_col):
+    creatives = generate_d2c_creatives(metrics, category_col=category_col)
+    return _d2c_result(metrics, creatives)
+
+
+def _d2c_result(metrics, creatives):
     # ---------------- Return All Outputs ----------------
     return {
-        "kpis": kpis,
-        "seo_opportunity": seo_opportunity,
-        "retention_summary": retention_summary,
+        "kpis": metrics["kpis"],
+        "category_kpis": metrics["category_kpis"],
+        "seo_opportunity": metrics["seo_opportunity"],
+        "retention_summary": metrics["retention_summary"],
         "creatives": creatives
     }
+
+
+def analyze_d2c_batch(datasets, category_col="category", max_workers=None, **kwargs):
+    """
+    Analyze many D2C datasets in parallel and yield results as each finishes.
+
+    Metric computation runs across a process pool; creative generation for
+    each finished file runs on a thread pool, with Gemini calls capped
+    globally by `LLM_SEMAPHORE`.
+
+    Files are loaded inside the workers: pass raw bytes (or paths) rather than
+    DataFrames so parsing is parallelised too. The format of raw bytes is
+    taken from the name's extension (.csv, otherwise Excel).
+
+    Parameters:
+        datasets (dict): name -> file path, raw file bytes or DataFrame
+        max_workers (int, optional): Size of the process pool
+
+    Yields:
+        tuple: (name, result) where result matches `analyze_d2c_data_with_creatives`.
+        If only creative generation failed, creatives is empty and the message
+        is in "creatives_error"; if the metrics failed, result is {"error": message}.
+    """
+    # Spawn rather than fork: the Streamlit server process is always multi-threaded
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as processes, \
+            ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as threads:
+        pending = {
+            processes.submit(
+                analyze_d2c_metrics, data, category_col=category_col,
+                file_format=None if isinstance(data, (str, pd.DataFrame)) else
+                ("csv" if name.lower().endswith(".csv") else "excel"), **kwargs
+            ): (name, None)
+            for name, data in datasets.items()
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                # metrics is None while the metrics step is pending, set once creatives are
+                name, metrics = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if metrics is None:
+                        yield name, {"error": str(e)}
+                    else:
+                        # Keep the file in the comparison when only the LLM step failed
+                        yield name, {**_d2c_result(metrics, []), "creatives_error": str(e)}
+                    continue
+                if metrics is None:
+                    pending[threads.submit(_with_creatives, result, category_col)] = (name, result)
+                else:
+                    yield name, result
+
+
+def build_d2c_comparison(results):
+    """
+    Consolidate batch results into comparison tables.
+
+    Parameters:
+        results (dict): name -> result from `analyze_d2c_batch`
+
+    Returns:
+        tuple: (by_file, by_category) DataFrames with ROAS / CAC / CTR per file
+        and per file + category.
+    """
+    by_file, by_category = [], []
+    for name, result in results.items():
+        if "error" in result:
+            continue
+        kpis = result["kpis"].iloc[0]
+        by_file.append({
+            "File": name,
+            "Total Spend": kpis["Total Spend"],
+            "Total Revenue": kpis["Total Revenue"],
+            "ROAS": kpis["ROAS"],
+            "CAC": kpis["CAC"],
+            "CTR": kpis["CTR"],
+        })
+        if not result["category_kpis"].empty:
+            by_category.append(result["category_kpis"].assign(File=name))
+
+    by_file = pd.DataFrame(by_file)
+    by_category = pd.concat(by_category, ignore_index=True) if by_category else pd.DataFrame()
+    if not by_category.empty:
+        leading = ["File", by_category.columns[0], "ROAS", "CAC", "CTR"]
+        by_category = by_category[leading + [c for c in by_category.columns if c not in leading]]
+    return by_file, by_category
@@ -18,6 +18,16 @@ def generate_report(insights_json, output_format="md"):
     else:
         metrics_section += "No statistical summary data available.\n"
 
+    comparison_section = "\n## Platform Comparison (Android vs iOS)\n\n"
+    comparison_df = insights_json.get("platform_comparison")
+    if isinstance(comparison_df, pd.DataFrame) and not comparison_df.empty:
+        significant = comparison_df[comparison_df["Significant"]].sort_values("q-Value")
+        comparison_section += f"{len(significant)} of {comparison_df['p-Value'].notna().sum()} category tests significant after Benjamini–Hochberg correction (q < 0.05).\n\n"
+        for index, c in significant.head(10).iterrows():
+            comparison_section += f"- **{c['Category']} / {c['Metric']}**: Android={c['Mean Android']:.2f}, iOS={c['Mean iOS']:.2f}, Diff={c['Mean Diff']:.2f}, n={c['n']}, q={c['q-Value']:.4g}\n"
+    else:
+        comparison_section += "No platform comparison data available.\n"
+
     rec_section = "\n## Executive Summary\n\n"
     # Correctly handle single-string summary
     if "summary" in insights_json and isinstance(insights_json["summary"], str):
@@ -25,7 +35,7 @@ def generate_report(insights_json, output_format="md"):
     else:
         rec_section += "No executive summary available.\n"
     
-    report_text = title + metrics_section + rec_section
+    report_text = title + metrics_section + comparison_section + rec_section
 
     if output_format == "md":
         return report_text
@@ -54,6 +64,11 @@ def generate_report(insights_json, output_format="md"):
             ]))
             story.append(table)
         story.append(Spacer(1, 12))
+        story.append(Paragraph("<b>Platform Comparison (Android vs iOS)</b>", styles["h2"]))
+        for line in comparison_section.strip().splitlines()[1:]:
+            if line.strip():
+                story.append(Paragraph(line.lstrip("- ").replace("**", ""), styles["Normal"]))
+        story.append(Spacer(1, 12))
         story.append(Paragraph("<b>Executive Summary</b>", styles["h2"]))
         story.append(Paragraph(insights_json.get("summary", "No summary available."), styles["Normal"]))
 